@@ -0,0 +1,203 @@
+import yt_dlp
+import logging
+import math
+import subprocess
+import threading
+from flask import Response, stream_with_context
+from handlers.download_state import download_progress
+from handlers.video_handler import VideoHandler
+
+logger = logging.getLogger(__name__)
+
+class ClipHandler:
+    @staticmethod
+    def parse_timestamp(value):
+        """Parse a timestamp given as seconds or [HH:]MM:SS[.ms] into seconds"""
+        if value is None or str(value).strip() == '':
+            return None
+        parts = str(value).strip().split(':')
+        if len(parts) > 3:
+            raise ValueError(f"Invalid timestamp: {value}")
+        seconds = 0.0
+        for index, part in enumerate(parts):
+            try:
+                number = float(part)
+            except ValueError:
+                raise ValueError(f"Invalid timestamp: {value}")
+            if not math.isfinite(number):
+                raise ValueError(f"Invalid timestamp: {value}")
+            if number < 0:
+                raise ValueError(f"Timestamp must not be negative: {value}")
+            # Only the leading field may exceed 59, e.g. 90 or 90:00 but not 1:90
+            if index > 0 and number >= 60:
+                raise ValueError(f"Invalid timestamp: {value}")
+            seconds = seconds * 60 + number
+        return seconds
+
+    @staticmethod
+    def get_ffmpeg_binary():
+        """Return the ffmpeg executable to use, or None if ffmpeg is unavailable"""
+        has_ffmpeg = VideoHandler.check_ffmpeg()
+        if not has_ffmpeg:
+            return None
+        # check_ffmpeg returns the path when using the bundled copy
+        return has_ffmpeg if isinstance(has_ffmpeg, str) else 'ffmpeg'
+
+    @staticmethod
+    def get_input_args(fmt, start, duration):
+        """Build ffmpeg input arguments that seek inside a remote format.
+
+        With -ss before -i, ffmpeg uses the container index (MP4 sidx/moov or
+        WebM cues) to jump to the nearest keyframe and issues HTTP range
+        requests, so only the bytes covering the clip are fetched.
+        """
+        headers = ''.join(f"{k}: {v}\r\n" for k, v in (fmt.get('http_headers') or {}).items())
+        args = ['-ss', f"{start:.3f}", '-t', f"{duration:.3f}"]
+        if headers:
+            args += ['-headers', headers]
+        return args + ['-i', fmt['url']]
+
+    @staticmethod
+    def download_clip(url, start=None, end=None, format_type='mp4', quality='best'):
+        """Stream only the [start, end) segment of a video as mp4 or mp3"""
+        try:
+            if start is not None and end is not None and end <= start:
+                raise ValueError("End time must be after start time")
+
+            ffmpeg = ClipHandler.get_ffmpeg_binary()
+            if not ffmpeg:
+                raise Exception("FFmpeg is required for clip extraction")
+
+            if format_type == 'mp4':
+                format_string = VideoHandler.get_format_string(quality, has_ffmpeg=True)
+            else:
+                format_string = 'bestaudio/best'
+
+            ydl_opts = {
+                'format': format_string,
+                'quiet': True,
+                'no_warnings': True,
+                'noplaylist': True
+            }
+
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(url, download=False)
+
+            total_duration = info.get('duration')
+            start = start or 0
+            if total_duration and start >= total_duration:
+                raise ValueError(f"Start time is past the end of the video ({total_duration}s)")
+            if end is None:
+                if not total_duration:
+                    raise ValueError("An end time is required for videos without a known duration")
+                end = total_duration
+            if total_duration:
+                end = min(end, total_duration)
+            if end <= start:
+                raise ValueError("End time must be after start time")
+            clip_duration = end - start
+
+            formats = info.get('requested_formats') or [info]
+            cmd = [ffmpeg, '-hide_banner', '-loglevel', 'error', '-nostats', '-progress', 'pipe:2']
+            for fmt in formats:
+                cmd += ClipHandler.get_input_args(fmt, start, clip_duration)
+            for index in range(len(formats)):
+                cmd += ['-map', f"{index}"]
+
+            if format_type == 'mp4':
+                # Stream copy keeps CPU cost near zero; fragmented output is pipe-friendly
+                cmd += ['-c', 'copy', '-movflags', 'frag_keyframe+empty_moov', '-f', 'mp4', 'pipe:1']
+                content_type = 'video/mp4'
+                extension = 'mp4'
+            else:
+                cmd += ['-vn', '-c:a', 'libmp3lame', '-b:a', '192k', '-f', 'mp3', 'pipe:1']
+                content_type = 'audio/mpeg'
+                extension = 'mp3'
+
+            title = info.get('title', 'clip')
+            filename = f"{title}_{int(start)}-{int(end)}.{extension}"
+            filename = "".join(c for c in filename if c.isalnum() or c in (' ', '-', '_', '.')).rstrip()
+
+            logger.info(f"Extracting clip {start:.3f}-{end:.3f}s from {url}")
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            ffmpeg_errors = []
+
+            def track_progress():
+                """Parse ffmpeg -progress output into the shared download state"""
+                for raw_line in process.stderr:
+                    line = raw_line.decode('utf-8', errors='replace').strip()
+                    if line.startswith('out_time_us='):
+                        try:
+                            out_time = int(line.split('=', 1)[1]) / 1_000_000
+                        except ValueError:
+                            continue
+                        download_progress['progress'] = min(out_time / clip_duration * 100, 99)
+                    elif line.startswith('speed='):
+                        download_progress['speed'] = line.split('=', 1)[1]
+                    elif '=' not in line and line:
+                        logger.error(f"ffmpeg: {line}")
+                        ffmpeg_errors.append(line)
+
+            def stop_process():
+                """Kill ffmpeg if it is still running, e.g. after a client disconnect"""
+                download_progress['started'] = False
+                download_progress['speed'] = 0
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+
+            progress_thread = threading.Thread(target=track_progress)
+            progress_thread.daemon = True
+            progress_thread.start()
+
+            download_progress['started'] = True
+            download_progress['status'] = 'downloading'
+
+            # Wait for the first output before answering, so an ffmpeg failure
+            # (403 on the format URL, bad seek, unmuxable codec) becomes a 400
+            # instead of an empty 200 download
+            try:
+                first_chunk = process.stdout.read1(8192)
+            except Exception:
+                stop_process()
+                raise
+            if not first_chunk:
+                stop_process()
+                progress_thread.join(timeout=1)
+                message = ffmpeg_errors[-1] if ffmpeg_errors else f"ffmpeg exited with code {process.returncode}"
+                raise Exception(f"Clip extraction failed: {message}")
+
+            def generate():
+                block_size = 8192
+                try:
+                    yield first_chunk
+                    while True:
+                        chunk = process.stdout.read(block_size)
+                        if not chunk:
+                            break
+                        yield chunk
+                    process.wait()
+                    progress_thread.join(timeout=1)
+                    if process.returncode == 0:
+                        download_progress['progress'] = 100
+                        download_progress['status'] = 'finished'
+                    else:
+                        logger.error(f"ffmpeg exited with code {process.returncode}")
+                        download_progress['status'] = 'error'
+                finally:
+                    stop_process()
+
+            response = Response(
+                stream_with_context(generate()),
+                content_type=content_type
+            )
+            response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+            # generate()'s finally never runs if the body is not iterated
+            # (HEAD requests, client gone before the first chunk)
+            response.call_on_close(stop_process)
+            return response, filename
+
+        except Exception as e:
+            logger.error(f"Error extracting clip: {str(e)}")
+            download_progress['status'] = 'error'
+            raise
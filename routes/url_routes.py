@@ -1,4 +1,4 @@
-from flask import jsonify, request, session, send_from_directory, render_template
+from flask import jsonify, request, session, send_from_directory, render_template, Response, stream_with_context
 import yt_dlp
 import logging
 import threading
@@ -10,14 +10,20 @@ import tempfile
 from pathlib import Path
 from handlers.video_handler import VideoHandler
 from handlers.audio_handler import AudioHandler
+from handlers.clip_handler import ClipHandler
 from handlers.download_state import download_progress
 from yt_dlp.cookies import extract_cookies_from_browser
 import json
 import re
 import requests
 from urllib.parse import parse_qs, urlparse
-from utils.youtube import get_video_id
+from utils.youtube import get_video_id, is_valid_video_id
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Limits for /api/video-info/bulk
+BULK_MAX_ITEMS = 500
+BULK_MAX_WORKERS = 16
 
 logger = logging.getLogger(__name__)
 
@@ -89,10 +95,24 @@ def get_video_info_direct(video_id):
         "Origin": "https://www.youtube.com"
     }
     
-    response = requests.post(url, params=params, json=data, headers=headers)
+    response = requests.post(url, params=params, json=data, headers=headers, timeout=30)
     response.raise_for_status()
     return response.json()
 
+def format_video_info(data):
+    """Extract the fields the frontend needs from an Innertube player response"""
+    video_details = data.get('videoDetails', {})
+    thumbnails = video_details.get('thumbnail', {}).get('thumbnails', [{}])
+    thumbnail_url = thumbnails[0].get('url', '')
+
+    return {
+        'title': video_details.get('title', 'Unknown Title'),
+        'author': video_details.get('author', video_details.get('channelTitle', 'Unknown Author')),
+        'thumbnail_url': thumbnail_url,
+        'duration': int(video_details.get('lengthSeconds', 0)),
+        'views': int(video_details.get('viewCount', 0))
+    }
+
 def init_routes(app, TEMP_DIR):
     @app.route('/api/download', methods=['GET'])
     def download_video():
@@ -106,8 +126,13 @@ def init_routes(app, TEMP_DIR):
             video_url = request.args.get('url')
             format_type = request.args.get('format', 'mp4')
             quality = request.args.get('quality', 'best')
-            
-            if format_type == 'mp4':
+            start = ClipHandler.parse_timestamp(request.args.get('start'))
+            end = ClipHandler.parse_timestamp(request.args.get('end'))
+
+            if start is not None or end is not None:
+                response, filename = ClipHandler.download_clip(video_url, start, end, format_type, quality)
+                return response
+            elif format_type == 'mp4':
                 response, filename = VideoHandler.download_video(video_url, quality, progress_hook)
                 return response
             else:
@@ -133,22 +158,81 @@ def init_routes(app, TEMP_DIR):
             data = get_video_info_direct(video_id)
             logger.debug(f"API Response: {json.dumps(data.get('videoDetails', {}), indent=2)}")
             
-            video_details = data.get('videoDetails', {})
-            thumbnails = video_details.get('thumbnail', {}).get('thumbnails', [{}])
-            thumbnail_url = thumbnails[0].get('url', '')
-            
-            return jsonify({
-                'title': video_details.get('title', 'Unknown Title'),
-                'author': video_details.get('author', video_details.get('channelTitle', 'Unknown Author')),
-                'thumbnail_url': thumbnail_url,
-                'duration': int(video_details.get('lengthSeconds', 0)),
-                'views': int(video_details.get('viewCount', 0))
-            })
+            return jsonify(format_video_info(data))
                     
         except Exception as e:
             logger.error(f"Error fetching video info: {str(e)}")
             return jsonify({'error': str(e)}), 400
 
+    @app.route('/api/video-info/bulk', methods=['POST'])
+    def get_video_info_bulk():
+        """Resolve many URLs/IDs concurrently, streaming one NDJSON line per result"""
+        try:
+            payload = request.get_json(silent=True) or {}
+            items = payload.get('urls') if isinstance(payload, dict) else payload
+            if not isinstance(items, list) or not items:
+                raise ValueError("Expected a JSON body with a non-empty 'urls' list")
+            if len(items) > BULK_MAX_ITEMS:
+                raise ValueError(f"At most {BULK_MAX_ITEMS} URLs are allowed per request")
+
+            # Dedupe by video ID, remembering every input that maps to it
+            video_ids = {}
+            invalid = []
+            for item in items:
+                try:
+                    video_id = get_video_id(str(item))
+                except (KeyError, IndexError):
+                    video_id = None
+                if not is_valid_video_id(video_id):
+                    invalid.append(item)
+                else:
+                    video_ids.setdefault(video_id, []).append(item)
+        except Exception as e:
+            logger.error(f"Error parsing bulk video info request: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+
+        logger.info(f"Fetching info for {len(video_ids)} videos ({len(invalid)} invalid)")
+
+        def resolve(video_id):
+            data = get_video_info_direct(video_id)
+            # Innertube answers 200 for private/deleted/missing videos; only those
+            # lack videoDetails (age-restricted or upcoming videos still carry it)
+            playability = data.get('playabilityStatus', {})
+            if not data.get('videoDetails'):
+                raise ValueError(playability.get('reason') or 'Video unavailable')
+            info = format_video_info(data)
+            info['playability_status'] = playability.get('status')
+            return info
+
+        def generate():
+            for item in invalid:
+                yield json.dumps({'url': item, 'error': 'Invalid YouTube URL'}) + '\n'
+
+            if not video_ids:
+                return
+
+            executor = ThreadPoolExecutor(max_workers=min(BULK_MAX_WORKERS, len(video_ids)))
+            futures = {}
+            try:
+                futures = {executor.submit(resolve, video_id): video_id for video_id in video_ids}
+                for future in as_completed(futures):
+                    video_id = futures[future]
+                    try:
+                        info = future.result()
+                    except Exception as e:
+                        logger.error(f"Error fetching video info for {video_id}: {str(e)}")
+                        info = {'error': str(e)}
+                    # One line per input so clients can match results to what they sent
+                    for item in video_ids[video_id]:
+                        yield json.dumps({'url': item, 'video_id': video_id, **info}) + '\n'
+            finally:
+                # Drop queued lookups if the client goes away mid-stream
+                for future in futures:
+                    future.cancel()
+                executor.shutdown(wait=False)
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
     @app.route('/api/progress')
     def get_progress():
         return jsonify(download_progress)
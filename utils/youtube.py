@@ -1,7 +1,19 @@
+import re
 from urllib.parse import parse_qs, urlparse
 
+VIDEO_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+def is_valid_video_id(video_id):
+    """Check that a string looks like an 11-character YouTube video ID"""
+    return bool(video_id) and bool(VIDEO_ID_PATTERN.match(video_id))
+
 def get_video_id(url):
-    """Extract video ID from YouTube URL"""
+    """Extract video ID from YouTube URL or bare video ID"""
+    if not url:
+        return None
+    url = url.strip()
+    if VIDEO_ID_PATTERN.match(url):
+        return url
     parsed = urlparse(url)
     if parsed.hostname in ('youtu.be', 'www.youtu.be'):
         return parsed.path[1:]